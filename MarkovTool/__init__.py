@@ -1,4 +1,4 @@
 from .description import Description, Stochastic, Markov
-from .instance import Instance, Endless, Finite, Dependent
+from .instance import Instance, Endless, Finite, Dependent, EndlessBatch, simulate_many
 from .stat import Collector
 from .model import Model
\ No newline at end of file
@@ -0,0 +1,282 @@
+"""Kernels used on hot paths of MarkovTool
+
+numba is optional, if it isn't installed every kernel falls back
+to an equivalent numpy implementation
+compiled walk and walk_end release the GIL, 
+so walks of separate instances may run in threads
+
+Static:
+HAS_NUMBA: bool
+    True if kernels are compiled with numba
+
+Functions:
+normalize_rows(m: ndarray, out: ndarray, tol: float) -> bool
+    writes rows of m normalized to out, checks they sum up to 1.0
+cumulative_rows(m: ndarray, out: ndarray) -> None
+    writes float32 cumulative sums of rows of m to out
+normalize_cumulative(m: ndarray, out: ndarray, cumulative: ndarray, tol: float) -> bool
+    normalize_rows and cumulative_rows in a single pass over the rows
+pick_state(cumulative: ndarray, pick: float) -> int
+    returns index of the first element of cumulative greater than pick
+guide_table(cumulative: ndarray) -> ndarray
+    builds guide tables for every cumulative row
+pick_guided(cumulative: ndarray, guide: ndarray, pick: float) -> int
+    pick_state starting from the guide table entry of pick
+walk(cumulative: ndarray, state: int, picks: ndarray, out: ndarray, guide: ndarray = None) -> None
+    writes states of a walk starting from state to out, one per pick
+walk_end(cumulative: ndarray, state: int, picks: ndarray, guide: ndarray = None) -> int
+    returns the last state of a walk starting from state, one step per pick
+walk_many(cumulative: ndarray, states: ndarray, picks: ndarray, out: ndarray, guide: ndarray = None) -> None
+    writes independent walks to rows of out, in parallel with numba
+"""
+from numpy import ndarray, float32, float64, int32, int64, newaxis, empty, arange, multiply, reciprocal, cumsum, abs as absolute
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+HAS_NUMBA: bool = njit is not None
+
+# fastmath without 'nnan' and 'ninf', so rows summing up to 0.0 are still caught
+_FASTMATH = {'reassoc', 'contract', 'arcp'}
+
+if HAS_NUMBA:
+    @njit(cache = True, fastmath = _FASTMATH, error_model = 'numpy')
+    def normalize_rows(m: ndarray, out: ndarray, tol: float) -> bool:
+        """writes rows of m normalized to out, checks they sum up to 1.0
+
+        m is read in any numeric dtype, sums are calculated in float64
+        out may be m itself
+        returns False as soon as a row fails the check
+        """
+        for i in range(m.shape[0]):
+            total = 0.0
+            for j in range(m.shape[1]):
+                total += m[i, j]
+            inverse = 1.0 / total
+            if not abs(total * inverse - 1.0) <= tol:
+                return False
+            for j in range(m.shape[1]):
+                out[i, j] = m[i, j] * inverse
+        return True
+
+else:
+    def normalize_rows(m: ndarray, out: ndarray, tol: float) -> bool:
+        """writes rows of m normalized to out, checks they sum up to 1.0
+
+        m is read in any numeric dtype, sums are calculated in float64
+        out may be m itself
+        only row sized buffers are allocated
+        """
+        total = m.sum(1, dtype = float64)
+        inverse = reciprocal(total)
+        multiply(m, inverse[:, newaxis], out = out, casting = 'same_kind')
+        total *= inverse
+        total -= 1.0
+        absolute(total, out = total)
+        return bool(total.max(initial = 0.0) <= tol)
+
+if HAS_NUMBA:
+    # no fastmath, float32 sums have to be accumulated in order like numpy.cumsum
+    @njit(cache = True)
+    def cumulative_rows(m: ndarray, out: ndarray) -> None:
+        """writes float32 cumulative sums of rows of m to out
+
+        elements from the last reachable column to the end of a row are set to 1.0
+        """
+        for i in range(m.shape[0]):
+            acc = float32(0.0)
+            for j in range(m.shape[1]):
+                acc += float32(m[i, j])
+                out[i, j] = acc
+            for j in range(m.shape[1]):
+                if out[i, j] >= acc:
+                    out[i, j] = 1.0
+
+    @njit(cache = True)
+    def normalize_cumulative(m: ndarray, out: ndarray, cumulative: ndarray, tol: float) -> bool:
+        """normalize_rows and cumulative_rows in a single pass over the rows
+
+        every row is normalized and accumulated while it is still in cache
+        returns False as soon as a row fails the check
+        """
+        for i in range(m.shape[0]):
+            if not normalize_rows(m[i:i + 1], out[i:i + 1], tol):
+                return False
+            cumulative_rows(out[i:i + 1], cumulative[i:i + 1])
+        return True
+
+else:
+    def cumulative_rows(m: ndarray, out: ndarray) -> None:
+        """writes float32 cumulative sums of rows of m to out
+
+        elements from the last reachable column to the end of a row are set to 1.0
+        """
+        cumsum(m, axis = 1, dtype = float32, out = out)
+        out[out >= out[:, -1:]] = 1.0
+
+    def normalize_cumulative(m: ndarray, out: ndarray, cumulative: ndarray, tol: float) -> bool:
+        """normalize_rows and cumulative_rows in a single pass over the rows
+
+        numpy works on whole arrays, so this is just the two calls
+        """
+        if not normalize_rows(m, out, tol):
+            return False
+        cumulative_rows(out, cumulative)
+        return True
+
+
+# rows up to this size are counted linearly, it beats binary search on short rows
+_LINEAR_SCAN = 8
+
+if HAS_NUMBA:
+    # explicit signature compiles at import, so the first draw doesn't pay for jit
+    @njit('int64(float32[::1], float64)', cache = True, fastmath = _FASTMATH)
+    def pick_state(cumulative: ndarray, pick: float) -> int:
+        """returns index of the first element of cumulative greater than pick
+
+        binary search over C-contiguous float32 row, 
+        rows of up to _LINEAR_SCAN elements are counted without branches instead,
+        pick stays float64 so no draw is rounded up to the next state
+        """
+        lo = 0
+        hi = cumulative.shape[0]
+        if hi <= _LINEAR_SCAN:
+            # row is sorted, so elements not greater than pick are the ones before the result
+            for i in range(hi):
+                lo += cumulative[i] <= pick
+            return lo
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if cumulative[mid] <= pick:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+else:
+    def pick_state(cumulative: ndarray, pick: float) -> int:
+        """returns index of the first element of cumulative greater than pick
+
+        pick is compared as float64, so no draw is rounded up to the next state
+        """
+        return int(cumulative.searchsorted(float64(pick), side = 'right'))
+
+
+# guide tables have a power of two entries per row, at most this many
+_GUIDE_MAX = 1024
+
+if HAS_NUMBA:
+    @njit(cache = True)
+    def guide_table(cumulative: ndarray) -> ndarray:
+        """builds guide tables for every cumulative row
+
+        entry q of a row is the number of elements of the row not greater than q / g,
+        where g is the smallest power of two not less than the row length, up to _GUIDE_MAX,
+        g being a power of two, int(pick * g) is exact for any float64 pick,
+        so searching from the entry of pick gives the same state as pick_state,
+        rows of up to _LINEAR_SCAN elements get no entries, pick_state is faster there
+
+        Returns:
+        ndarray
+            int32 shaped (rows, g)
+        """
+        k = cumulative.shape[1]
+        g = 0 if k <= _LINEAR_SCAN else 1
+        while 0 < g < k and g < _GUIDE_MAX:
+            g *= 2
+        guide = empty((cumulative.shape[0], g), dtype = int32)
+        for i in range(cumulative.shape[0]):
+            j = 0
+            for q in range(g):
+                while cumulative[i, j] <= q / g:
+                    j += 1
+                guide[i, q] = j
+        return guide
+
+else:
+    def guide_table(cumulative: ndarray) -> ndarray:
+        """builds guide tables for every cumulative row
+
+        see the compiled version, one searchsorted per row
+        """
+        k = cumulative.shape[1]
+        g = 0 if k <= _LINEAR_SCAN else 1
+        while 0 < g < k and g < _GUIDE_MAX:
+            g *= 2
+        thresholds = arange(g) / g
+        guide = empty((cumulative.shape[0], g), dtype = int32)
+        for i in range(cumulative.shape[0]):
+            guide[i] = cumulative[i].searchsorted(thresholds, side = 'right')
+        return guide
+
+
+def pick_guided(cumulative: ndarray, guide: ndarray, pick: float) -> int:
+    """pick_state starting from the guide table entry of pick
+
+    cumulative and guide are rows of the same state,
+    on average fewer than two elements are compared, for any distribution,
+    the last element of a cumulative row is 1.0, so the search stops within the row,
+    guide shouldn't be empty
+    """
+    j = guide[int(pick * guide.shape[0])]
+    while cumulative[j] <= pick:
+        j += 1
+    return j
+
+if HAS_NUMBA:
+    pick_guided = njit(cache = True)(pick_guided)
+
+
+def walk(cumulative: ndarray, state: int, picks: ndarray, out: ndarray, guide: ndarray = None) -> None:
+    """writes states of a walk starting from state to out, one per pick
+
+    cumulative holds cumulative rows of a transition matrix,
+    next state is pick_state of the row of the current state,
+    or pick_guided if guide_table of cumulative is given,
+    picks should be float64 uniform in range [0, 1)
+    numba compiles separately for guide None, without the other loop
+    """
+    if guide is None:
+        for i in range(picks.shape[0]):
+            state = pick_state(cumulative[state], picks[i])
+            out[i] = state
+    else:
+        for i in range(picks.shape[0]):
+            state = pick_guided(cumulative[state], guide[state], picks[i])
+            out[i] = state
+
+if HAS_NUMBA:
+    walk = njit(cache = True, nogil = True)(walk)
+
+
+def walk_end(cumulative: ndarray, state: int, picks: ndarray, guide: ndarray = None) -> int:
+    """returns the last state of a walk starting from state, one step per pick
+
+    like walk, but states along the way aren't stored
+    """
+    if guide is None:
+        for i in range(picks.shape[0]):
+            state = pick_state(cumulative[state], picks[i])
+    else:
+        for i in range(picks.shape[0]):
+            state = pick_guided(cumulative[state], guide[state], picks[i])
+    return state
+
+if HAS_NUMBA:
+    walk_end = njit(cache = True, nogil = True)(walk_end)
+
+
+def walk_many(cumulative: ndarray, states: ndarray, picks: ndarray, out: ndarray, guide: ndarray = None) -> None:
+    """writes independent walks to rows of out, in parallel with numba
+
+    row i of out is walk from states[i] with picks from row i of picks,
+    rows only read the shared cumulative and guide, so they run on separate threads
+    """
+    for i in prange(picks.shape[0]):
+        walk(cumulative, states[i], picks[i], out[i], guide)
+
+if HAS_NUMBA:
+    walk_many = njit(cache = True, parallel = True)(walk_many)
@@ -1,16 +1,47 @@
-from numpy import array, zeros, ndarray, float32, allclose, newaxis, cumsum
+from numpy import newaxis, asarray, may_share_memory, fromiter, empty, ndarray, integer, intp, int64, float32, float64, bincount, unique
 from numpy.random import default_rng, Generator
-from copy import copy
-from typing import Iterable
+from itertools import count, chain
+from bisect import bisect_right
+from weakref import WeakValueDictionary
+from typing import Iterable, Callable
 from typing_extensions import Self
 
+from ._kernels import normalize_rows, cumulative_rows, normalize_cumulative, guide_table, pick_state, walk, walk_end
+
+def _owner(value: ndarray) -> ndarray:
+    """returns the array owning the data of value"""
+    return value if value.base is None else value.base
+
+def _is_view_of(value, stored: ndarray) -> bool:
+    """True if value is stored or a view spanning exactly the same data"""
+    return (isinstance(value, ndarray) and isinstance(stored, ndarray)
+            and (value is stored or _owner(value) is _owner(stored))
+            and value.dtype == stored.dtype
+            and value.shape == stored.shape
+            and value.strides == stored.strides
+            and value.ctypes.data == stored.ctypes.data)
+
+# matrices which passed Stochastic._verify_matrix,
+# keyed by id of the owner and address of the data
+_verified: WeakValueDictionary = WeakValueDictionary()
+
+def _verified_base(value) -> ndarray:
+    """returns verified matrix if value is the matrix or its view, None otherwise"""
+    if not isinstance(value, ndarray):
+        return None
+    verified = _verified.get((id(_owner(value)), value.ctypes.data))
+    if _is_view_of(value, verified):
+        return verified
+    return None
+
 class Description():
     """Class describing a process
 
     Static:
-    _count: int = 0
-        number of all instances created
     _gen_id() -> int
+        returns new unique id, atomic under the GIL
+    __slots__: tuple[str]
+        attributes are stored in slots, subclasses list only their own
 
     Properties:
     shape: tuple[int]
@@ -27,19 +58,19 @@ class Description():
         returns self._id
     __eq__(self) -> bool
         uses hash equality
-    __str__(self) -> str
     __repr__(self) -> str
+        also used by str()
+    _has_property(cls, name: str) -> bool
+        True if name is a property of the class
+    _clone(self) -> Self
+        returns shallow copy with a new id
     variant(self, **kwargs) -> Self
         returns modified copy
     """
     
-    _count: int = 0
-    @staticmethod
-    def _gen_id() -> int:
-        """returns new unique id"""
-        id = Description._count
-        Description._count += 1
-        return id
+    __slots__ = ('_id', '_shape', '__weakref__')
+
+    _gen_id = staticmethod(count().__next__)
     
     def __init__(self, shape: tuple[int] = None):
         """constructor setting shape"""
@@ -55,9 +86,6 @@ class Description():
         """uses hash equality"""
         return type(self) == type(other) and hash(self) == hash(other)
 
-    def __str__(self) -> str:
-        return self.__repr__() 
-
     def __repr__(self) -> str:
         name = type(self).__name__
         shape = str(self._shape)
@@ -90,15 +118,40 @@ class Description():
         else:
             raise ValueError('Shape must be tuple of two positive integers')
 
+    @classmethod
+    def _has_property(cls, name: str) -> bool:
+        """True if name is a property of the class
+
+        looks up the class only, so no getter is called
+        """
+        return isinstance(getattr(cls, name, None), property)
+
+    def _clone(self) -> Self:
+        """returns shallow copy with a new id
+
+        arrays are shared by reference, no property setter is called
+        slots of every class in mro are copied, so is __dict__ of a subclass without slots
+        """
+        cls = type(self)
+        result = object.__new__(cls)
+        for klass in cls.__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                if name != '__weakref__' and hasattr(self, name):
+                    setattr(result, name, getattr(self, name))
+        if hasattr(self, '__dict__'):
+            result.__dict__.update(self.__dict__)
+        result._id = Description._gen_id()
+        return result
+
     def variant(self, **kwargs) -> Self:
         """returns modified copy
 
         pass property name and desired value as keyword arguments
+        values identical to the ones stored by self are not set again
         """
-        result = copy(self)
-        self._id = Description._gen_id()
+        result = self._clone()
         for name, value in kwargs.items():
-            if hasattr(result, name):
+            if self._has_property(name) and value is not getattr(self, '_' + name, None):
                 setattr(result, name, value)
         return result
 
@@ -117,29 +170,75 @@ class Stochastic(Description):
     _my_seed: int = None
     _matrix: ndarray = None
     _matrix_cumsum: ndarray = None
-        precalculated values for picking algorithm
+        precalculated values for picking algorithm,
+        C-contiguous float32, rows end exactly at 1.0
+    _matrix_cumsum_rows: list[list[float]] | list[ndarray] = None
+        rows of _matrix_cumsum searched by _transition, built on first transition,
+        lists of floats for up to _LIST_ROWS_MAX columns, views otherwise
+    _search_row: Callable[[list | ndarray, float], int] = None
+        bisect_right for lists, _kernels.pick_state for views
     _initial_state: int | ndarray = None
-    _initial_state_cum_sum: ndarray = None
-        precalculated values for picking algorithm
+    _initial_state_cumsum: ndarray = None
+        precalculated values for picking algorithm,
+        float32, the last reachable state ends exactly at 1.0,
+        None if initial state is an int
+    _matrix_guide: ndarray = None
+        guide tables of _matrix_cumsum, built on first walk
+
+    Static:
+    _pick_state(cumulative: ndarray, pick: float) -> int
+        returns index of the first element of cumulative greater than pick
+    _LIST_ROWS_MAX: int = 256
+        bisect_right on a list beats a call into a kernel for a single pick,
+        for longer rows lists of floats take too much memory
 
     Methods:
     __init__(self, shape, my_seed, matrix, initial_state)
         constructor setting shape, my_seed, matrix and initial_state
     __repr__(self) -> str
-    _verify_matrix(self, value: list[list[float]] | ndarray) -> ndarray
-        returns verified copy of the matrix
+    _verify_matrix(self, value: list[list[float]] | ndarray) -> tuple[ndarray, ndarray]
+        returns verified copy of the matrix and its cumulative rows
+    _assign_matrix(self, value: ndarray, rows: ndarray = None, cumulative: ndarray = None) -> None
+        stores already verified matrix and calculates self._matrix_cumsum
     _verify_initial_state(self, value: int | ndarray) -> int | ndarray
         returns verified copy of an initial state
     _initial(self, pick: float) -> int
         defines rule for initial state
+    _search_rows(self, rows: ndarray = None) -> list[list[float]] | list[ndarray]
+        returns rows of _matrix_cumsum in the form searched by _search_row
     _transition(self, state: int, pick: float) -> int
-        defines rule for the next state 
+        defines rule for the next state, 
+        prefer simulate or _walk to calling it in a loop
+    _guide(self) -> ndarray | None
+        returns guide tables of the cumulative rows
+    _walkable(self) -> bool
+        True if every state reached by a walk is a row of the matrix
+    _check_walk(self, state: int) -> None
+        raises ValueError unless a walk may start from state
+    _walk(self, state: int, picks: ndarray, out: ndarray = None) -> ndarray
+        returns states following state, one per pick
+    _walk_end(self, state: int, picks: ndarray) -> int
+        returns the state reached from state after one step per pick
+    matrix_copy(self) -> ndarray
+        returns writable copy of the matrix
+    simulate(self, n: int, rng: Generator = None) -> ndarray
+        returns n states of the process generated at once
     fill_random(self, seed_: int) -> Generator:
         generates random matrix
+    random_batch(cls, count: int, seed_: int, rng: Generator, **kwargs) -> list[Self]
+        generates count descriptions with random matrices
     fit(self, data: Iterable[tuple[int, int]], weights: tuple[float, float] = (1.0, 1.0))
         fit self._matrix values counting state transitions
     
     """
+
+    __slots__ = ('_my_seed', '_matrix', '_matrix_cumsum', '_matrix_cumsum_rows', '_search_row',
+                 '_matrix_guide', 
+                 '_initial_state', '_initial_state_cumsum')
+
+    _pick_state = staticmethod(pick_state)
+    _LIST_ROWS_MAX: int = 256
+
     def __init__(self, shape: tuple[int] = None, my_seed: int = None, 
                  matrix: ndarray = None, initial_state: int | ndarray = None):
         """constructor setting shape, my_seed, matrix, initial_state
@@ -151,6 +250,9 @@ class Stochastic(Description):
         self.my_seed: int = my_seed
         self._matrix: ndarray = None
         self._matrix_cumsum: ndarray = None
+        self._matrix_cumsum_rows: list[list[float]] | list[ndarray] = None
+        self._search_row: Callable[[list | ndarray, float], int] = None
+        self._matrix_guide: ndarray = None
         self.matrix = matrix
         self._initial_state: int | ndarray = None
         self._initial_state_cumsum: ndarray = None
@@ -178,104 +280,174 @@ class Stochastic(Description):
     def matrix(self) -> ndarray:
         """probability matrix for a process
 
+        returns read-only view, use matrix_copy to get a writable array
         raises ValueError
         """
         if self._matrix is not None:
-            return copy(self._matrix)
+            return self._matrix.view()
         else:
             raise ValueError('Matrix isn\'t defined yet')
 
     @matrix.setter
     def matrix(self, value: ndarray) -> None:
         """matrix property setter
-        also calculates self._matrix_cumsum
+        also calculates self._matrix_cumsum and drops guide tables
+        assigning the current matrix or its view is a no-op,
+        matrix of any description or its view is shared without verification
 
         raises ValueError
         """
-        if value is None:
+        if value is None or _is_view_of(value, self._matrix):
             return
         
-        self._matrix = self._verify_matrix(value)
-        self._matrix_cumsum = cumsum(self._matrix, axis=1)
+        verified = _verified_base(value)
+        if verified is not None and verified.shape == self.shape:
+            self._assign_matrix(verified)
+        else:
+            matrix, cumulative = self._verify_matrix(value)
+            self._assign_matrix(matrix, cumulative=cumulative)
 
-    def _verify_matrix(self, value: list[list[float]] | ndarray) -> ndarray:
-        """returns verified copy of the matrix
-        
-        values are normalized so the sum of every row is equal to 1.0
-        raises ValueError 
+    def _assign_matrix(self, value: ndarray, rows: ndarray = None, cumulative: ndarray = None) -> None:
+        """stores already verified matrix and calculates self._matrix_cumsum
+
+        value is frozen and taken by reference
+        if rows are given, only these rows differ from the current matrix
+        and cumsum is recalculated just for them
+        if cumulative is given, it is taken as C-contiguous cumsum of value
         """
-        try:
-            value = array(value, dtype=float32)
+        value.flags.writeable = False
+        _verified[(id(_owner(value)), value.ctypes.data)] = value
+        if cumulative is None and rows is None:
+            cumulative = empty(value.shape, dtype=float32)
+            cumulative_rows(value, cumulative)
+        elif cumulative is None:
+            # cumsum may be shared with variants, so it is copied, not updated in place
+            cumulative = self._matrix_cumsum.copy()
+            part = empty((len(rows), value.shape[1]), dtype=float32)
+            cumulative_rows(value[rows], part)
+            cumulative[rows] = part
+        search_rows = self._matrix_cumsum_rows
+        self._matrix = value
+        self._matrix_cumsum = cumulative
+        # float32 values convert to floats exactly, so both searches give the same state
+        self._search_row = bisect_right if value.shape[1] <= self._LIST_ROWS_MAX else pick_state
+        if rows is not None and search_rows is not None:
+            # the list may be shared with variants, so it is copied, not updated in place
+            search_rows = list(search_rows)
+            for row, search_row in zip(rows, self._search_rows(rows)):
+                search_rows[row] = search_row
+            self._matrix_cumsum_rows = search_rows
+        else:
+            self._matrix_cumsum_rows = None
+        self._matrix_guide = None
+
+    def matrix_copy(self) -> ndarray:
+        """returns writable copy of the matrix
 
-            if value.shape != self.shape:
-                raise ValueError('Matrix dimension should be equal to the original dimension')
-            
-            value /= value.sum(1)[:, newaxis]
+        raises ValueError
+        """
+        if self._matrix is not None:
+            return self._matrix.copy()
+        else:
+            raise ValueError('Matrix isn\'t defined yet')
 
-            if not allclose(value.sum(1), 1.0):
-                raise ValueError('Matrix should be a right-stochastic matrix')
-            
-            return value
+    def _verify_matrix(self, value: list[list[float]] | ndarray) -> tuple[ndarray, ndarray]:
+        """returns verified copy of the matrix and its cumulative rows
+        
+        values are normalized in float64 so the sum of every row is equal to 1.0,
+        then stored as float32, value itself is read without copying
+        normalization and cumsum are done in a single pass, see _kernels.normalize_cumulative
+        float32 matrix which is already stochastic is copied without normalizing,
+        e.g. matrix_copy of another description
+        raises ValueError 
+        """
+        value = asarray(value)
+        if value.dtype.kind not in 'biuf':
+            value = value.astype(float64)
+
+        if value.shape != self.shape:
+            raise ValueError('Matrix dimension should be equal to the original dimension')
+
+        if value.dtype == float32:
+            deviation = abs(value.sum(1, dtype=float64) - 1.0)
+            if deviation.max(initial=0.0) <= 1e-6:
+                result = value.copy()
+                cumulative = empty(self.shape, dtype=float32)
+                cumulative_rows(result, cumulative)
+                return result, cumulative
+
+        result = empty(self.shape, dtype=float32)
+        cumulative = empty(self.shape, dtype=float32)
+        if not normalize_cumulative(value, result, cumulative, 1e-10):
+            raise ValueError('Matrix should be a right-stochastic matrix')
         
-        except ValueError as err:
-            raise err
+        return result, cumulative
 
     @property
     def initial_state(self) -> int | ndarray:
         """initial distribution of a process
 
+        distribution is returned as read-only view
         raises ValueError
         """
-        if self._initial_state is not None:
-            return copy(self._initial_state)
+        initial_state = self._initial_state
+        if isinstance(initial_state, ndarray):
+            return initial_state.view()
+        elif initial_state is not None:
+            return initial_state
         else:
             raise ValueError('Initial state isn\' defined yet')
     
     @initial_state.setter
     def initial_state(self, value: int | list | ndarray) -> None:
         """initial_state property setter
-        also calculates self._initial_state_cumsum
+        also calculates self._initial_state_cumsum for a distribution
+        assigning the current distribution or its view is a no-op
 
         raises ValueError
         """
-        if value is None:
+        if value is None or _is_view_of(value, self._initial_state):
             return
 
         self._initial_state = self._verify_initial_state(value)
-        self._initial_state_cumsum = cumsum(self._initial_state)
+        if isinstance(self._initial_state, ndarray):
+            self._initial_state.flags.writeable = False
+            self._initial_state_cumsum = empty(self._initial_state.shape, dtype=float32)
+            cumulative_rows(self._initial_state[newaxis], self._initial_state_cumsum[newaxis])
+        else:
+            self._initial_state_cumsum = None
 
     def _verify_initial_state(self, value: int | list | ndarray) -> int | ndarray:
         """returns verified copy of the initial_state
 
         value: int 
             should be in range [0, self.shape[0])
-        value: list | ndarray
-            after normalization sum over rows should be close to 1.0
+        value: list | tuple | ndarray
+            after normalization sum over rows should be close to 1.0,
+            value itself is never modified
 
         raises ValueError, TypeError
         """
-        try:
-            if isinstance(value, (list, ndarray)):
-                if len(value) != self.shape[0]:
-                    raise ValueError('Initial state size should be input size')
-
-                value /= value.sum()[newaxis]         
-
-                if allclose(value.sum(), 1.0):
-                    return array(value, dtype = float32)
-                else:
-                    raise ValueError('Initial state probabilities should normalize to sum 1.0')
-            
-            elif isinstance(value, int):
-                if value < 0 or value >= self.shape[0]:
-                    raise ValueError(f'Invalid initial state: int {value}')
-                else:
-                    return value
+        if isinstance(value, (int, integer)):
+            if value < 0 or value >= self.shape[0]:
+                raise ValueError(f'Invalid initial state: int {value}')
             else:
-                raise TypeError('Initial state should be the type of either int, list or numpy.ndarray')
-        except (ValueError, TypeError) as err:
-            print(value)
-            raise err
+                return int(value)
+
+        if not isinstance(value, (list, tuple, ndarray)):
+            raise TypeError('Initial state should be the type of either int, list or numpy.ndarray')
+
+        converted = asarray(value, dtype = float32)
+        if converted.shape != (self.shape[0], ):
+            raise ValueError('Initial state size should be input size')
+
+        # a fresh conversion is normalized in place, value itself is never written,
+        # asarray may return value or a view of it, e.g. for subclasses like memmap
+        result = empty(converted.shape, dtype = float32) if may_share_memory(converted, value) else converted
+        if normalize_rows(converted[newaxis], result[newaxis], 1e-5):
+            return result
+        else:
+            raise ValueError('Initial state probabilities should normalize to sum 1.0')
     
     def _initial(self, pick: float) -> int:
         """defines rule for initial state
@@ -284,16 +456,21 @@ class Stochastic(Description):
         pick: float
             should be random value uniform in range [0, 1)
         """
-
-        if isinstance(self.initial_state, ndarray):
-            accumulated = self._initial_state_cumsum
-            for i, value in enumerate(accumulated):
-                if pick < value:
-                    return i
-            else: 
-                raise ValueError('pick is higher than the last element of accumulated')    
+        if self._initial_state_cumsum is not None:
+            return self._pick_state(self._initial_state_cumsum, pick)
         else:
-            return self.initial_state
+            return self._initial_state
+
+    def _search_rows(self, rows: ndarray = None) -> list[list[float]] | list[ndarray]:
+        """returns rows of _matrix_cumsum in the form searched by _search_row
+
+        lists of floats for bisect_right, views for pick_state,
+        all rows if rows is None
+        """
+        cumulative = self._matrix_cumsum if rows is None else self._matrix_cumsum[rows]
+        if self._search_row is bisect_right:
+            return cumulative.tolist()
+        return list(cumulative)
 
     def _transition(self, state: int, pick: float) -> int:
         """defines rule for the next state
@@ -304,27 +481,146 @@ class Stochastic(Description):
         pick: float
             should be random value uniform in range [0, 1)
         """
-        accumulated = self._matrix_cumsum[state]
-        for i, value in enumerate(accumulated):
-            if pick < value:
-                return i
-        else: 
-            print(pick, accumulated)
-            raise ValueError('pick is higher than the last element of accumulated')
+        search_rows = self._matrix_cumsum_rows
+        if search_rows is None:
+            # built on the first transition, descriptions which are only walked never pay for it
+            search_rows = self._matrix_cumsum_rows = self._search_rows()
+        return self._search_row(search_rows[state], pick)
+
+    def _guide(self) -> ndarray | None:
+        """returns guide tables of the cumulative rows
+
+        tables are built on the first call, see _kernels.guide_table,
+        walks start searching a row from the guide entry of a pick,
+        which gives the same states as the binary search of _transition,
+        None for short rows, walks scan them directly
+        """
+        if self._matrix_guide is None:
+            self._matrix_guide = guide_table(self._matrix_cumsum)
+        return self._matrix_guide if self._matrix_guide.shape[1] else None
+
+    def _walkable(self) -> bool:
+        """True if every state reached by a walk is a row of the matrix
+
+        that is for shape[1] <= shape[0], kernels don't check bounds,
+        so other shapes are stepped by _transition, which raises IndexError
+        """
+        return self._matrix is not None and self._shape[1] <= self._shape[0]
+
+    def _check_walk(self, state: int) -> None:
+        """raises ValueError unless a walk may start from state"""
+        if not self._walkable():
+            raise ValueError('Walks need a matrix with a row for every state, shape[1] <= shape[0]')
+        if not 0 <= state < self._shape[0]:
+            raise ValueError(f'State should be int in range [0, {self._shape[0]})')
+
+    def simulate(self, n: int, rng: Generator = None) -> ndarray:
+        """returns n states of the process generated at once
+
+        the whole walk runs in _kernels.walk, instead of calling _transition n times
+        first state is picked by _initial, following states by transitions,
+        rng is drawn once per transition and once more for a distributed initial state,
+        so for an int initial state the result matches Endless(self).take(n)
+
+        Parameters:
+        n: int
+            number of states
+        rng: Generator = None
+            defaults to numpy.random.default_rng(self.my_seed)
+
+        raises ValueError, also for shape[1] > shape[0], see _walkable
+        """
+        if self._matrix is None:
+            raise ValueError('Matrix isn\'t defined yet')
+        if self._initial_state is None:
+            raise ValueError('Initial state isn\' defined yet')
+        if not self._walkable():
+            raise ValueError('Walks need a matrix with a row for every state, shape[1] <= shape[0]')
+        if rng is None:
+            rng = default_rng(self._my_seed)
+
+        result = empty(n, dtype=int64)
+        if n == 0:
+            return result
+        if self._initial_state_cumsum is not None:
+            result[0] = self._initial(rng.random())
+        else:
+            result[0] = self._initial_state
+        walk(self._matrix_cumsum, result[0], rng.random(n - 1), result[1:], self._guide())
+        return result
+
+    def _walk(self, state: int, picks: ndarray, out: ndarray = None) -> ndarray:
+        """returns states following state, one per pick
+
+        picks should be float64 uniform in range [0, 1), see _kernels.walk
+        states are written into out if given, int64 of the same length as picks
+        raises ValueError, see _check_walk
+        """
+        self._check_walk(state)
+        result = empty(len(picks), dtype=int64) if out is None else out
+        walk(self._matrix_cumsum, state, picks, result, self._guide())
+        return result
+
+    def _walk_end(self, state: int, picks: ndarray) -> int:
+        """returns the state reached from state after one step per pick
+
+        states along the way aren't stored, see _kernels.walk_end
+        raises ValueError, see _check_walk
+        """
+        self._check_walk(state)
+        return int(walk_end(self._matrix_cumsum, state, picks, self._guide()))
 
     def fill_random(self, seed_: int = None, rng: Generator = None) -> Self:
         """generates random matrix 
         
         Using seed_ as a sequence for rng
-        Generates valid matrix values
+        Generates valid matrix values,
+        rows and initial state are uniform on the probability simplex,
+        normalized standard exponential draws are Dirichlet(1, ..., 1)
         Returns self
         """
         if rng is None:
             rng = default_rng(seed_)
-        self.matrix = rng.random(self.shape)
-        self.initial_state = rng.random(self.shape[0])
+        self.matrix = rng.standard_exponential(self.shape, dtype=float32)
+        self.initial_state = rng.standard_exponential(self.shape[0], dtype=float32)
         return self
 
+    @classmethod
+    def random_batch(cls, count: int, seed_: int = None, rng: Generator = None, **kwargs) -> list[Self]:
+        """generates count descriptions with random matrices
+
+        all matrices are drawn and normalized at once,
+        which is faster than calling fill_random count times,
+        values are distributed the same way as in fill_random
+        
+        Parameters:
+        count: int
+            number of descriptions
+        seed_: int = None
+            used as a sequence for rng
+        rng: Generator = None
+        **kwargs
+            passed to the constructor, shape has to be defined
+
+        raises ValueError
+        """
+        if rng is None:
+            rng = default_rng(seed_)
+        template = cls(**kwargs)
+        drawn = rng.standard_exponential((count * template.shape[0], template.shape[1]), dtype=float32)
+        initial_states = rng.standard_exponential((count, template.shape[0]), dtype=float32)
+        matrices = empty((count, *template.shape), dtype=float32)
+        cumulatives = empty((count, *template.shape), dtype=float32)
+        if not normalize_cumulative(drawn, matrices.reshape(drawn.shape), cumulatives.reshape(drawn.shape), 1e-10):
+            raise ValueError('Matrix should be a right-stochastic matrix')
+        matrices.flags.writeable = False
+
+        result = [template] + [cls(**kwargs) for _ in range(count - 1)]
+        for description, matrix, cumulative, initial_state in zip(result, matrices, cumulatives, initial_states):
+            description._assign_matrix(matrix, cumulative=cumulative)
+            description.initial_state = initial_state
+        return result[:count]
+
     def fit(self, data: Iterable[tuple[int, int]], weights: tuple[float, float] = (1.0, 1.0)):
         """fit self._matrix values counting state transitions
         
@@ -333,6 +629,8 @@ class Stochastic(Description):
         if weights[0] == 0.0 or self._matrix is None,
         uniformly distributed values are placed into rows, 
         for states with no transitions
+        otherwise only rows of states with transitions are recalculated,
+        the other rows are kept as they are
         
         Parameters:
         data: Iterable[tuple[int, int]]
@@ -343,19 +641,31 @@ class Stochastic(Description):
         
         raises ValueError
         """
-        mat = zeros(self.shape, int)
-        not_present: set = set(range(self.shape[0]))
-        for prev, now in data:
-            mat[prev, now] += 1
-            not_present.discard(prev)
-        
-        mat = mat.astype(float32)
-        if self._matrix is None or weights[0] == 0.0:
-            for state in not_present:
-                mat[state, :] = 1    
+        if isinstance(data, ndarray):
+            pairs = asarray(data, dtype=intp).reshape(-1, 2)
+        else:
+            pairs = fromiter(chain.from_iterable(data), dtype=intp).reshape(-1, 2)
+        if len(pairs) and (pairs.min() < 0 or pairs[:, 0].max() >= self.shape[0] or pairs[:, 1].max() >= self.shape[1]):
+            raise ValueError('Transition out of the state space')
+        flat = pairs[:, 0] * self.shape[1] + pairs[:, 1]
+        mat = bincount(flat, minlength=self.shape[0] * self.shape[1]).reshape(self.shape).astype(float64)
+
+        if self._matrix is not None and weights[0] != 0.0:
+            rows = unique(pairs[:, 0])
+            blended = mat[rows]
+            blended *= weights[1]
+            blended += weights[0]*self._matrix[rows]
+            normalized = empty(blended.shape, dtype=float32)
+            if not normalize_rows(blended, normalized, 1e-10):
+                raise ValueError('Not enough data to fit')
+            result = self._matrix.copy()
+            result[rows] = normalized
+            self._assign_matrix(result, rows)
+            return
+
+        mat[~mat.any(1)] = 1.0
         if self._matrix is not None:
             mat *= weights[1]
-            mat += weights[0]*self._matrix
         
         try:
             self.matrix = mat
@@ -376,6 +686,8 @@ class Markov(Stochastic):
     This exists just for making sure input and output sizes are the same
     """
 
+    __slots__ = ()
+
     def __init__(self, dimension: int = None, my_seed: int = None, 
                  matrix: ndarray = None, initial_state: int | ndarray = None):
         """constructor setting dimension and my_seed"""
@@ -388,10 +700,7 @@ class Markov(Stochastic):
         calls Description.shape getter
         raises ValueError
         """
-        try:
-            return self.shape[0]
-        except ValueError as err:
-            raise err        
+        return self.shape[0]
 
     @dimension.setter
     def dimension(self, value: int) -> None:
@@ -400,7 +709,4 @@ class Markov(Stochastic):
         calls Description.shape setter
         raises ValueError
         """
-        try:
-            self.shape = (value, value)
-        except ValueError as err:
-            raise err
+        self.shape = (value, value)
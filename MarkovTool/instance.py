@@ -1,22 +1,59 @@
-from copy import deepcopy, copy
+from copy import copy
 from typing import Callable, Iterator, Iterable, Hashable
 from typing_extensions import Self
-from numpy.random import Generator, default_rng
-from itertools import islice
+from numpy import ndarray, empty, full, asarray, int64
+from numpy.random import Generator, BitGenerator, PCG64, default_rng
+from itertools import islice, count
+import os
 
 from .description import Stochastic
+from ._kernels import walk_many
 from .stat import Collector
 
+# unseeded, initial states are picked independently of my_seed,
+# created once, default_rng(None) gathers OS entropy on every call
+_initial_rng: Generator = default_rng()
+
+
+def _reseed_initial_rng() -> None:
+    """replaces _initial_rng with a freshly seeded one
+
+    called in a forked child, it would repeat the parent's picks otherwise
+    """
+    global _initial_rng
+    _initial_rng = default_rng()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child = _reseed_initial_rng)
+
+
+def _rng_snapshot(rng: Generator) -> tuple[type, dict]:
+    """returns type and state of the bit generator of rng
+
+    the state is a fresh dict, later draws from rng don't change it
+    """
+    return type(rng.bit_generator), rng.bit_generator.state
+
+
+def _rng_from_snapshot(snapshot: tuple[type, dict]) -> Generator:
+    """returns generator continuing the stream captured by _rng_snapshot
+
+    copies only the state of the bit generator, cheaper than deepcopy,
+    constant seed skips gathering entropy for a state that is overwritten anyway
+    """
+    bit_generator_type, state = snapshot
+    bit_generator = bit_generator_type(0)
+    bit_generator.state = state
+    return Generator(bit_generator)
+
 
 class Instance(Iterator):
     """Representing a process specific to a backend
     A backend needs to be hashable
 
     Static:
-    _count: int = 0
-        number of all instances created
     _gen_id() -> int
-        returns new unique id
+        returns new unique id, atomic under the GIL
 
     Properties:
     has_stopped: bool
@@ -33,11 +70,12 @@ class Instance(Iterator):
     _has_stopped: bool = False
     _state: int = -1
         last state generated
-    _forced_state: int | Generator = None
+    _forced_state: int | Iterator = None
         is assigned a value in state.setter
     _step: int = 0
         number of times __next__ has been called
-    _collectors: set[Collector] = set()
+    _collectors: list[Collector] = []
+        collectors in order of binding, without duplicates
     _id: int
 
     Methods:
@@ -47,10 +85,10 @@ class Instance(Iterator):
         returns self._id
     __eq__(self) -> bool
         uses hash equality
-    __str__(self) -> str
     __repr__(self) -> str
-    _verify_state(self, value: int | Iterable[int]) -> int | Generator
-        returns veirified state value
+        also used by str()
+    _verify_state(self, value: int | Iterable[int]) -> int | Iterator
+        returns verified state value
     _bind_collector(self, collector: Collector) -> None
         adds collector to self._collectors
     _unbind_collector(self, collector: Collector) -> None
@@ -59,25 +97,24 @@ class Instance(Iterator):
         creates entry for emitting
     _emit(self, step: int, state: int) -> None
         put a new entry in all from self._collectors
+    _emit_block(self, states: list[int]) -> None
+        put entries for states following self._step in all from self._collectors
     __iter__(self) -> Self
         return self
     __next__(self) -> int
         pick a new state, emit and return it 
-    take(self, n: int = None) -> list:
-        returns list of next n generated states
+    take(self, n: int = None, as_list: bool = True) -> list | ndarray:
+        returns next n generated states
     skip(self, n: int = None) -> None:
         advance the iterator n steps
     branch(self, **kwargs) -> Self:
         returns a modified copy
     """
 
-    _count: int = 0
-    @staticmethod
-    def _gen_id() -> int:
-        """returns new unique id"""
-        id = Instance._count
-        Instance._count += 1
-        return id
+    __slots__ = ('_backend', '_has_stopped', '_state', '_forced_state', '_step',
+                 '_collectors', '_id', '__weakref__')
+
+    _gen_id = staticmethod(count().__next__)
     
     def __init__(self, backend: Hashable = None) -> None:
         """constructor creating new instance"""
@@ -87,7 +124,7 @@ class Instance(Iterator):
         self._forced_state: int = None
         self._step: int = 0
     
-        self._collectors: set[Collector] = set()
+        self._collectors: list[Collector] = []
 
         self._id = Instance._gen_id()
 
@@ -99,9 +136,6 @@ class Instance(Iterator):
         """uses hash equality"""
         return type(self) == type(other) and hash(self) == hash(other)
 
-    def __str__(self) -> str:
-        return self.__repr__()
-
     def __repr__(self) -> str:
         name = type(self).__name__
         return f'{name}(_id: {self._id}, _backend: {self._backend}, step: {self._step}, state: {self._state})'
@@ -128,18 +162,23 @@ class Instance(Iterator):
         value = self._verify_state(value)
         self._forced_state = value
 
-    def _verify_state(self, value: int | Iterable[int]) -> int | Generator:
-        """returns argument value unchanged"""
+    def _verify_state(self, value: int | Iterable[int]) -> int | Iterator:
+        """returns argument value unchanged
+
+        iterables are detected by __iter__, cheaper than isinstance with Iterable ABC,
+        iter returns iterators as they are and C-level iterators for builtin containers
+        """
         if isinstance(value, int):
             return value
-        elif isinstance(value, Iterable):
-            return (_ for _ in value)
+        elif hasattr(value, '__iter__'):
+            return iter(value)
         else:
             return None
 
     def _bind_collector(self, collector: Collector) -> None:
         """adds collector to self._collectors"""
-        self._collectors.add(collector)
+        if collector not in self._collectors:
+            self._collectors.append(collector)
 
     def _unbind_collector(self, collector: Collector) -> None:
         """remove collector from self._collectors"""
@@ -150,18 +189,38 @@ class Instance(Iterator):
         return {'backend': self._backend, 'instance': self, 'step': self._step, 'state': self.state}
 
     def _emit(self) -> None:
-        """put a new entry in all from self._collectors"""
-        if len(self._collectors) == 0:
-            return
-        else:
-            closed = []
-            for collector in self._collectors:
-                if collector._is_open:
-                    collector.put(**self._entry())
-                else:
-                    closed.append(collector)
-            for collector in closed:
-                self._unbind_collector(collector)
+        """put a new entry in all from self._collectors
+
+        __next__ calls it only if any collector is bound,
+        entry fields are passed positionally, no dict is built per step
+        """
+        collectors = self._collectors
+        has_closed = False
+        for collector in collectors:
+            if collector._is_open:
+                collector.put(self, self._step, self._state, self._backend)
+            else:
+                has_closed = True
+        if has_closed:
+            # in place, the list may be shared with branches
+            collectors[:] = [collector for collector in collectors if collector._is_open]
+
+    def _emit_block(self, states: list[int]) -> None:
+        """put entries for states following self._step in all from self._collectors
+
+        same entries as calling _emit for every state, 
+        passed to collectors at once with Collector.put_batch,
+        call before advancing self._step
+        """
+        collectors = self._collectors
+        has_closed = False
+        for collector in collectors:
+            if collector._is_open:
+                collector.put_batch(self, self._step, states, self._backend)
+            else:
+                has_closed = True
+        if has_closed:
+            collectors[:] = [collector for collector in collectors if collector._is_open]
                     
     def __iter__(self) -> Self:
         return self
@@ -173,32 +232,38 @@ class Instance(Iterator):
         self._state = ...
         return super().__next__()
 
-        if _forced_state is int, use that value
-        if _forced_state is Generator, use next value
+        if _forced_state is an iterator, has __next__, use next value until it is exhausted
+        otherwise if _forced_state isn't None, use that value
+        no type is checked unless a state is forced
         """
-        if isinstance(self._forced_state, int):
-            self._state = self._forced_state
-            self._forced_state = None
-        elif isinstance(self._forced_state, Generator):
-            value = next(self._forced_state, None)
-            if not value:
-                self._forced_state = None
+        forced = self._forced_state
+        if forced is not None:
+            if hasattr(forced, '__next__'):
+                value = next(forced, None)
+                if value is None:
+                    self._forced_state = None
+                else:
+                    self._state = value
             else:
-                self._state = value
+                self._state = forced
+                self._forced_state = None
 
-        self._emit()
+        if self._collectors:
+            self._emit()
         self._step += 1
         return self._state    
         
-    def take(self, n: int = None) -> list:
-        """returns list of next n generated states
+    def take(self, n: int = None, as_list: bool = True) -> list | ndarray:
+        """returns next n generated states
         
         if n is None generate until self is not exhausted
+        list of int if as_list, otherwise int64 ndarray
         """
         if n is None:
-            return list(self)
+            result = list(self)
         else:
-            return list(islice(self, n))
+            result = list(islice(self, n))
+        return result if as_list else asarray(result, dtype = int64)
 
     def skip(self, n: int = None) -> None:
         """advance the iterator n steps
@@ -239,14 +304,42 @@ class Endless(Instance):
     _backend: Stochastic
         extends Instance._backend
         describe stochastic behaviour of the process
-    _state_rng: numpy.random.Generator = numpy.random.default_rng()
-        rng used for transitions
+    _state_rng: numpy.random.Generator = Generator(_BIT_GENERATOR(my_seed))
+        rng used for transitions, access through _rng()
+        None in a branch until it draws for the first time
+    _pending_rng: tuple[type, dict] = None
+        snapshot the branch's _state_rng is created from, see _rng_snapshot
+    _dim: int
+        number of states of self._backend, cached for _verify_state
+    _rng_buffer: list[float] = []
+        uniforms drawn from _state_rng ahead, every block twice as long as the previous one,
+        from _RNG_BUFFER_MIN up to _RNG_BUFFER_SIZE
+    _rng_index: int = 0
+        index of the next uniform in _rng_buffer
+
+    Static:
+    _BIT_GENERATOR: type[BitGenerator] = PCG64
+        same as numpy.random.default_rng, numpy.random.SFC64 draws faster,
+        but seeded processes produce different states with it
+    _RNG_BUFFER_MIN: int = 16
+        first block is short, instances taking a few steps don't draw ahead much
+    _RNG_BUFFER_SIZE: int = 4096
+    _SKIP_BLOCK_SIZE: int = 65536
+        number of picks drawn at once by skip
+    _block_next: Callable
+        __next__ reproduced by block generation, see _batchable
     
     Methods:
     __init__(self, description: Stochastic)
         constructor creating new instance from description, extends Instance.__init__
     _verify_state(self, value: int) -> int
         returns verified value
+    _rng(self) -> Generator
+        returns self._state_rng, creating it from self._pending_rng if needed
+    _next_uniform(self) -> float
+        returns next uniform of the stream of self._state_rng
+    _next_uniforms(self, n: int) -> ndarray
+        returns next n uniforms of the stream of self._state_rng
     _pick_initial_state(self) -> int
         uses self._backend._initial as rule 
     _pick_next_state(self) -> int
@@ -255,34 +348,93 @@ class Endless(Instance):
         extends Instance._entry, assigns description
     __next__(self) -> int
         extends Instance.__next__
+    _batchable(self) -> bool
+        True if next states may be generated in a block
+    take(self, n: int = None, as_list: bool = True) -> list | ndarray
+        extends Instance.take, generates states in a block when possible
+    _take_block(self, n: int, as_list: bool = True) -> list | ndarray
+        returns next n states generated in a block
+    skip(self, n: int = None) -> None
+        extends Instance.skip, advances in blocks when possible
+    _skip_block(self, n: int) -> None
+        advances n steps in blocks
     branch(self, **kwargs) -> Self
         extends Instance.branch, assigns _state_rng and correct description
     """
+    __slots__ = ('_state_rng', '_pending_rng', '_dim', '_rng_buffer', '_rng_index')
+
+    _BIT_GENERATOR: type[BitGenerator] = PCG64
+    _RNG_BUFFER_MIN: int = 16
+    _RNG_BUFFER_SIZE: int = 4096
+    _SKIP_BLOCK_SIZE: int = 65536
+
     def __init__(self, description: Stochastic) -> None:
         super().__init__(description)
-        self._state_rng: Generator = default_rng(self._backend.my_seed)
+        self._state_rng: Generator = Generator(self._BIT_GENERATOR(self._backend.my_seed))
+        self._pending_rng: tuple[type, dict] = None
+        self._dim: int = self._backend.shape[0]
+        self._rng_buffer: list[float] = []
+        self._rng_index: int = 0
 
     def _verify_state(self, value: int) -> int:
         """return verified state"""
-        if value < 0 or value >= self._backend.shape[0]:
-            raise ValueError(f'State should be int in range [0, {self._backend.dimension})')
+        if not 0 <= value < self._dim:
+            raise ValueError(f'State should be int in range [0, {self._dim})')
         return value
 
+    def _rng(self) -> Generator:
+        """returns self._state_rng, creating it from self._pending_rng if needed
+
+        branches pay for a generator only once they draw
+        """
+        rng = self._state_rng
+        if rng is None:
+            rng = self._state_rng = _rng_from_snapshot(self._pending_rng)
+            self._pending_rng = None
+        return rng
+
+    def _next_uniform(self) -> float:
+        """returns next uniform of the stream of self._state_rng
+
+        uniforms are drawn in blocks, a float64 block yields
+        the same values as drawing them one at a time,
+        so growing the blocks doesn't change the stream
+        """
+        index = self._rng_index
+        if index == len(self._rng_buffer):
+            size = min(max(2 * index, self._RNG_BUFFER_MIN), self._RNG_BUFFER_SIZE)
+            # replaced, not refilled, the list may be shared with branches
+            self._rng_buffer = self._rng().random(size).tolist()
+            index = 0
+        self._rng_index = index + 1
+        return self._rng_buffer[index]
+
+    def _next_uniforms(self, n: int) -> ndarray:
+        """returns next n uniforms of the stream of self._state_rng
+
+        rest of the buffer comes first, then the uniforms are drawn directly
+        """
+        result = empty(n)
+        rest = self._rng_buffer[self._rng_index:self._rng_index + n]
+        self._rng_index += len(rest)
+        result[:len(rest)] = rest
+        if len(rest) < n:
+            self._rng().random(out = result[len(rest):])
+        return result
+
     def _pick_initial_state(self) -> int:
         """uses self._backend._initial as rule 
         
-        uses numpy.random.default_rng(None)
+        uses unseeded _initial_rng shared by all instances
         """
-        rng = default_rng(None)
-        pick: float = rng.random()
-        return self._backend._initial(pick)
+        return self._backend._initial(_initial_rng.random())
 
     def _pick_next_state(self) -> int:
         """uses self._backend._transition as rule, calling with self.state 
 
-        uses self._state_rng
+        uses self._state_rng through self._next_uniform
         """
-        pick: float = self._state_rng.random()
+        pick: float = self._next_uniform()
         return self._backend._transition(self._state, pick)
 
     def __next__(self) -> int:
@@ -297,60 +449,205 @@ class Endless(Instance):
             self._state = self._pick_next_state()
 
         return super().__next__()
+
+    _block_next = __next__
+
+    def _batchable(self) -> bool:
+        """True if next states may be generated in a block
+
+        that is when __next__ is the one set as _block_next,
+        _pick_next_state isn't overridden, no state is forced
+        and the description may be walked, see Stochastic._walkable,
+        bound collectors get the block through _emit_block
+        """
+        cls = type(self)
+        return (cls.__next__ is cls._block_next
+                and cls._pick_next_state is Endless._pick_next_state
+                and self._forced_state is None
+                and self._backend._walkable())
+
+    def take(self, n: int = None, as_list: bool = True) -> list | ndarray:
+        """extends Instance.take, generates states in a block when possible
+
+        see _batchable, states after the first one are generated 
+        by self._backend._walk, using the same picks from self._state_rng
+        as calling __next__ n times
+        """
+        if n is None or not self._batchable():
+            return super().take(n, as_list)
+        return self._take_block(n, as_list)
+
+    def _take_block(self, n: int, as_list: bool = True) -> list | ndarray:
+        """returns next n states generated in a block
+
+        the states are walked straight into the returned array
+        """
+        result = empty(n, dtype = int64)
+        offset = 0
+        if n > 0 and self._step == 0:
+            result[0] = next(self)
+            offset = 1
+        if n > offset:
+            states = self._backend._walk(self._state, self._next_uniforms(n - offset),
+                                         out = result[offset:])
+            if self._collectors:
+                self._emit_block(states.tolist())
+            self._state = int(states[-1])
+            self._step += n - offset
+        return result.tolist() if as_list else result
+
+    def skip(self, n: int = None) -> None:
+        """extends Instance.skip, advances in blocks when possible
+
+        see _batchable, only the last state of every block is kept
+        unless a collector is bound, picks are the same as calling __next__ n times
+        """
+        if n is None or not self._batchable():
+            return super().skip(n)
+        self._skip_block(n)
+
+    def _skip_block(self, n: int) -> None:
+        """advances n steps in blocks"""
+        if n > 0 and self._step == 0:
+            next(self)
+            n -= 1
+        while n > 0:
+            block = min(n, self._SKIP_BLOCK_SIZE)
+            picks = self._next_uniforms(block)
+            if self._collectors:
+                states = self._backend._walk(self._state, picks).tolist()
+                self._emit_block(states)
+                self._state = states[-1]
+            else:
+                self._state = self._backend._walk_end(self._state, picks)
+            self._step += block
+            n -= block
         
     def branch(self, **kwargs) -> Self:
         """extends Instance.branch, assigns _state_rng and correct description
         
-        new _state_rng will be a deepcopy of self._state_rng
+        new _state_rng continues the stream of self._state_rng,
+        it is created on the first draw from a snapshot taken now, see _rng
         pass property name and desired value as keyword arguments
         use properties from Description to assign a variant description
         """
         new = super().branch(**kwargs)
-        new._state_rng = deepcopy(self._state_rng)
-        kwargs = dict(((k, v) for k, v in kwargs.items() if hasattr(self._backend, k)))
+        if self._state_rng is not None:
+            new._pending_rng = _rng_snapshot(self._state_rng)
+        new._state_rng = None
+        kwargs = dict(((k, v) for k, v in kwargs.items() if self._backend._has_property(k)))
         if kwargs:
             new._backend = self._backend.variant(**kwargs)
+            new._dim = new._backend.shape[0]
         return new
 
 class Finite(Endless):
     """Class inheriting from Endless implementing a stop condition
 
     Attributes:
-    _stop_predicate: Callable[[Finite], bool]
+    _stop_predicate: Callable[[Finite], bool] | None
         if called returns True, raise StopIteration
+        None if there is no predicate to call
+    _max_step: int | None
+        raise StopIteration once _max_step states are generated
+        None if there is no limit
+    _stop_mask: list[bool] | None
+        raise StopIteration after a state marked True is generated
+        None if there are no stop states
     
     Methods:
-    __init__(self, description, stop_predicate: Callable = ...)
-        extends Endless.__init__ and sets stop_predicate
-    __iter__(self) -> Self:
-        extends Endless.__iter__
+    __init__(self, description, stop_predicate: Callable = None, max_step: int = None,
+             stop_states: Iterable[int] = None)
+        extends Endless.__init__ and sets stop conditions
     __next__(self) -> int:
-        check self._stop_predicate and call Endless.__next__
+        check stop conditions and call Endless.__next__
+    _batchable(self) -> bool
+        extends Endless._batchable, False if any stop condition is set
+    _block_limit(self, n: int) -> int
+        returns how many of n states may be generated in a block
+    take(self, n: int = None, as_list: bool = True) -> list | ndarray
+        extends Endless.take, generates up to _max_step in a block when possible
+    skip(self, n: int = None) -> None
+        extends Endless.skip, advances up to _max_step in blocks when possible
     """
+    __slots__ = ('_stop_predicate', '_max_step', '_stop_mask')
+
     def __init__(self, description: Stochastic,
-                 stop_predicate: Callable[[Self], bool] = lambda self: False):
-        """extends Endless.__init__ and sets stop_predicate
+                 stop_predicate: Callable[[Self], bool] = None,
+                 max_step: int = None, stop_states: Iterable[int] = None):
+        """extends Endless.__init__ and sets stop conditions
         
         Parameters:
         description: Description
             passed to Endless.__init__
-        stop_predicate: Callable[[Self], bool]
-            defaults to lambda self: False
+        stop_predicate: Callable[[Self], bool] = None
+            called before every state but the first one,
+            None never stops, without the cost of a call per step
+        max_step: int = None
+            number of states generated before stopping,
+            checked without calling anything
+        stop_states: Iterable[int] = None
+            terminal states, stops after generating any of them,
+            same as stop_predicate lambda self: self.state in stop_states,
+            checked with a single list lookup
         """
         super().__init__(description)
         self._stop_predicate = stop_predicate
+        self._max_step = max_step
+        self._stop_mask: list[bool] = None
+        if stop_states is not None:
+            self._stop_mask = [False] * self._dim
+            for state in stop_states:
+                self._stop_mask[self._verify_state(state)] = True
             
-    def __iter__(self) -> Self:
-        """extends Endless.__iter__"""
-        return super().__iter__()
-
     def __next__(self) -> int:
-        """check self._stop_predicate and call Endless.__next__"""
-        if self._step > 0 and self._stop_predicate(self):
+        """check stop conditions and call Endless.__next__"""
+        if ((self._max_step is not None and self._step >= self._max_step)
+                or (self._step > 0 and (
+                    (self._stop_mask is not None and self._stop_mask[self._state])
+                    or (self._stop_predicate is not None and self._stop_predicate(self))))):
             self._has_stopped = True
             raise StopIteration
         return super().__next__()
 
+    _block_next = __next__
+
+    def _batchable(self) -> bool:
+        """extends Endless._batchable, False if any stop condition is set"""
+        return (self._stop_predicate is None and self._max_step is None
+                and self._stop_mask is None and super()._batchable())
+
+    def _block_limit(self, n: int) -> int:
+        """returns how many of n states may be generated in a block
+
+        None unless only _max_step is set and blocks are possible,
+        n is None means as many as possible
+        """
+        if (self._max_step is None or self._stop_predicate is not None 
+                or self._stop_mask is not None or not Endless._batchable(self)):
+            return None
+        left = max(self._max_step - self._step, 0)
+        return left if n is None else min(n, left)
+
+    def take(self, n: int = None, as_list: bool = True) -> list | ndarray:
+        """extends Endless.take, generates up to _max_step in a block when possible"""
+        limit = self._block_limit(n)
+        if limit is None:
+            return super().take(n, as_list)
+        result = self._take_block(limit, as_list)
+        if n is None or n > limit:
+            self._has_stopped = True
+        return result
+
+    def skip(self, n: int = None) -> None:
+        """extends Endless.skip, advances up to _max_step in blocks when possible"""
+        limit = self._block_limit(n)
+        if limit is None:
+            return super().skip(n)
+        self._skip_block(limit)
+        if n is None or n > limit:
+            self._has_stopped = True
+
 class Dependent(Endless):
     """inherits from Endless, process with Instance object as input
     uses self._input.state for transitions
@@ -361,6 +658,8 @@ class Dependent(Endless):
 
     Attributes:
     _input: Instance
+    _parent: Instance
+        instance assigned through input property
 
     Methods:
     __init__(self, description: Stochastic, parent: Instance)
@@ -369,7 +668,11 @@ class Dependent(Endless):
         overwrites Endless._pick_initial_state, call self._pick_next_state
     _pick_next_state()
         overwrites Endless._pick_next_state, uses transition with self.parent.state
+    __next__(self) -> int
+        overrides Endless.__next__, picks from self._parent state every step
     """
+    __slots__ = ('_input', '_parent')
+
     def __init__(self, description: Stochastic, input: Instance) -> None:
         super().__init__(description)
         self._input: Instance = None
@@ -403,12 +706,201 @@ class Dependent(Endless):
     def _pick_next_state(self) -> int:
         """overwrites Endless._pick_next_state, uses transition with self.parent.state
         """
-        pick: float = self._state_rng.random()
+        pick: float = self._next_uniform()
         return self._backend._transition(self._parent.state, pick)
     
     def __next__(self) -> int:
-        if self._parent.has_stopped:
+        """overrides Endless.__next__, picks from self._parent state every step
+
+        states are picked by _pick_initial_state and _pick_next_state, so overriding them works,
+        Instance.__next__ is called only for a forced state
+        """
+        if self._parent._has_stopped:
             self._has_stopped = True
             raise StopIteration()
-        
-        return super().__next__() 
+
+        if self._step == 0:
+            self._state = self._pick_initial_state()
+        else:
+            self._state = self._pick_next_state()
+        if self._forced_state is not None:
+            return Instance.__next__(self)
+
+        if self._collectors:
+            self._emit()
+        self._step += 1
+        return self._state
+
+class EndlessBatch(Iterator):
+    """independent chains of one description advanced together
+
+    states of all chains are kept in a single int64 ndarray instead of one Endless per chain,
+    chains share _state_rng, every step draws one uniform per chain in order of chains,
+    so take(n) returns the same states as calling __next__ n times
+
+    Properties:
+    states: ndarray
+        copy of the last states, one per chain
+
+    Attributes:
+    _backend: Stochastic
+    _chains: int
+    _states: ndarray = None
+        int64 last states of chains, None until the first step
+    _step: int = 0
+        number of states generated for every chain
+    _state_rng: numpy.random.Generator = Generator(_BIT_GENERATOR(description.my_seed))
+        rng used for transitions
+
+    Static:
+    _BIT_GENERATOR: type[BitGenerator] = PCG64
+        see Endless._BIT_GENERATOR
+
+    Methods:
+    __init__(self, description: Stochastic, chains: int)
+        constructor creating chains of description
+    _pick_initial_states(self) -> ndarray
+        returns first state of every chain
+    __next__(self) -> ndarray
+        returns next state of every chain
+    take(self, n: int) -> ndarray
+        returns next n states of every chain shaped (n, chains)
+    """
+    __slots__ = ('_backend', '_chains', '_states', '_step', '_state_rng')
+
+    _BIT_GENERATOR: type[BitGenerator] = PCG64
+
+    def __init__(self, description: Stochastic, chains: int) -> None:
+        """constructor creating chains of description"""
+        self._backend: Stochastic = description
+        self._chains: int = chains
+        self._states: ndarray = None
+        self._step: int = 0
+        self._state_rng: Generator = Generator(self._BIT_GENERATOR(description.my_seed))
+
+    def __repr__(self) -> str:
+        name = type(self).__name__
+        return f'{name}(_backend: {self._backend}, chains: {self._chains}, step: {self._step})'
+
+    @property
+    def states(self) -> ndarray:
+        """returns copy of the last states, one per chain"""
+        if self._states is not None:
+            return self._states.copy()
+        else:
+            raise ValueError('No state generated yet')
+
+    def _pick_initial_states(self) -> ndarray:
+        """returns first state of every chain
+
+        picks are drawn from unseeded _initial_rng like in Endless
+        """
+        cumulative = self._backend._initial_state_cumsum
+        if cumulative is None:
+            return full(self._chains, self._backend._initial_state, dtype = int64)
+        picks = _initial_rng.random(self._chains)
+        return cumulative.searchsorted(picks, side = 'right').astype(int64)
+
+    def __next__(self) -> ndarray:
+        """returns next state of every chain"""
+        return self.take(1)[0]
+
+    def take(self, n: int) -> ndarray:
+        """returns next n states of every chain shaped (n, chains)
+
+        all chains are walked at once by _kernels.walk_many,
+        in parallel threads when numba is available
+        raises ValueError for shape[1] > shape[0], see Stochastic._walkable
+        """
+        if not self._backend._walkable():
+            raise ValueError('Walks need a matrix with a row for every state, shape[1] <= shape[0]')
+        result = empty((n, self._chains), dtype = int64)
+        if n == 0:
+            return result
+        start = 0
+        if self._step == 0:
+            self._states = result[0] = self._pick_initial_states()
+            start = 1
+        if n > start:
+            picks = self._state_rng.random((n - start, self._chains))
+            # step-major arrays, transposed so every chain is a row
+            walk_many(self._backend._matrix_cumsum, self._states, picks.T, result[start:].T,
+                      self._backend._guide())
+        self._states = result[-1].copy()
+        self._step += n
+        return result
+
+def simulate_many(instances: Iterable[Endless], n: int) -> ndarray:
+    """returns next n states of every instance generated at once
+
+    equivalent to calling take(n) on every instance in order,
+    instances are advanced the same way and should be distinct
+    block-capable instances sharing a matrix are walked together,
+    in parallel threads when numba is available, see Endless._batchable
+    other instances, including ones of descriptions which can't be walked,
+    fall back to take, every instance before them
+    has taken its n states by then, so they may depend on earlier instances
+
+    Returns:
+    ndarray
+        int64 states shaped (len(instances), n), row per instance
+
+    raises ValueError if an instance stops before generating n states,
+    like take in order, instances before it have taken n states and the rest none
+    """
+    instances = list(instances)
+    result = empty((len(instances), n), dtype = int64)
+    if n == 0:
+        return result
+
+    # rows of block-capable instances grouped by matrix and number of states left
+    groups: dict[tuple[int, int], tuple[ndarray, ndarray, list[int]]] = {}
+    for i, instance in enumerate(instances):
+        if not (isinstance(instance, Endless) and instance._batchable()):
+            _walk_groups(instances, groups, result)
+            groups.clear()
+            states = instance.take(n, as_list = False)
+            if len(states) < n:
+                raise ValueError(f'Instance stopped after {len(states)} of {n} states')
+            result[i] = states
+            continue
+        offset = 0
+        if instance._step == 0:
+            result[i, 0] = next(instance)
+            offset = 1
+        backend = instance._backend
+        cumulative = backend._matrix_cumsum
+        groups.setdefault((id(cumulative), offset), (cumulative, backend._guide(), []))[2].append(i)
+
+    _walk_groups(instances, groups, result)
+    return result
+
+
+def _walk_groups(instances: list[Endless], groups: dict, result: ndarray) -> None:
+    """walks grouped instances of simulate_many to the last column of result
+
+    instances are advanced and emit in order of their rows
+    """
+    n = result.shape[1]
+    walked: dict[int, ndarray] = {}
+    for (_, offset), (cumulative, guide, rows) in groups.items():
+        m = n - offset
+        if m == 0:
+            continue
+        states = empty(len(rows), dtype = int64)
+        picks = empty((len(rows), m))
+        for j, i in enumerate(rows):
+            states[j] = instances[i]._state
+            picks[j] = instances[i]._next_uniforms(m)
+        out = empty((len(rows), m), dtype = int64)
+        walk_many(cumulative, states, picks, out, guide)
+        result[rows, offset:] = out
+        for j, i in enumerate(rows):
+            walked[i] = out[j]
+
+    for i in sorted(walked):
+        instance, states = instances[i], walked[i]
+        if instance._collectors:
+            instance._emit_block(states.tolist())
+        instance._state = int(states[-1])
+        instance._step += len(states)
@@ -1,7 +1,10 @@
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Hashable, Generator
-from itertools import islice
+from itertools import islice, count
+from array import array
+from numpy import fromiter, arange, argsort, unique, int64
+from numpy.lib.stride_tricks import sliding_window_view
 
 class ChunkType(Enum):
     """Enum class, use this as a pattern for matching"""
@@ -15,11 +18,12 @@ class ChunkRaw:
     Attributes:
     start: int
         step of the first state in a chunk
-    data: list[int]
+    data: array
+        states as C ints, typecode 'i', half the size of a list of ints
     type_: ChunkType
     """
     start: int
-    data: list[int]
+    data: array
     type_: ChunkType = field(default = ChunkType.RAW, init = False)
 
 @dataclass
@@ -44,14 +48,15 @@ class Collector:
     """Gathers states emitted by instances
 
     Static:
-    _count: int = 0
-        number of all instances created
     _gen_id() -> int
-        return new unique id
+        return new unique id, atomic under the GIL
 
     Attributes:
     _entries: dict
         nested dictionary recording all states, see put for details
+    _raw_end: dict
+        for every backend the furthest step covered by a raw chunk, 
+        steps past it can't match and skip the search 
     _is_open: bool = True
         if set to False no entries are accepted 
     _id: int
@@ -67,8 +72,12 @@ class Collector:
         stop accepting entries
     _match(self, group: dict, step: int, state: int) -> tuple[ChunkRaw, Hashable]
         searches for the chunk containing specific value on correct step
+    _extend_raw_end(self, backend: Hashable, chunk: ChunkRaw)
+        records the end of a raw chunk written to
     put(self, instance: Hashable, step: int, state: int, backend: Hashable = None) -> bool
         try to make a new entry
+    put_batch(self, instance: Hashable, start: int, states: list[int], backend: Hashable = None) -> None
+        make entries for consecutive steps, same as put for every state
     redirect(self, src: Hashable, dst: Hashable) -> bool
         copy entries of src as emitted by dst
     length(self, id: int) -> int
@@ -85,15 +94,11 @@ class Collector:
     may implement method _bind_collector(self, collector),
     must implement method _entry(self) returning dict with keys 
     {'instance', 'step', 'state', 'backend'} where value for 'backend' may be None
-    Instances may emit their state by calling put with _entry() result as keyword arguments
+    Instances may emit their state by calling put with _entry() result as keyword arguments,
+    or with the same values passed positionally, which avoids building a dict per step,
+    states generated in a block may be emitted at once by calling put_batch
     """
-    _count: int = 0
-    @staticmethod
-    def _gen_id() -> int:
-        """return new unique id"""
-        id = Collector._count
-        Collector._count += 1
-        return id
+    _gen_id = staticmethod(count().__next__)
 
     def __init__(self, *instances):
         """Calls self.open(*instances)  
@@ -103,6 +108,7 @@ class Collector:
         """
         self._entries: dict[Hashable, dict[Hashable, list[ChunkRef | ChunkRaw]]] = {}
         self._entries['__EMPTY__'] = {}
+        self._raw_end: dict[Hashable, int] = {}
         self._is_open: bool = True
         self._id = Collector._gen_id()
         self.open(*instances)
@@ -148,6 +154,12 @@ class Collector:
 
         return (None, None)
 
+    def _extend_raw_end(self, backend: Hashable, chunk: ChunkRaw):
+        """records the end of a raw chunk written to"""
+        end = chunk.start + len(chunk.data)
+        if end > self._raw_end.get(backend, 0):
+            self._raw_end[backend] = end
+
     def put(self, instance: Hashable, step: int, state: int, backend: Hashable = None) -> bool:
         """Try to make a new entry
         Makes sure no duplicates are present for instances from given backend
@@ -173,9 +185,12 @@ class Collector:
             backend = '__EMPTY__'
         group = self._entries.setdefault(backend, dict())
 
-        raw_match, instance_ = self._match(group, step, state)
-        if instance_ == instance:
-            return False
+        if self._raw_end.get(backend, 0) > step:
+            raw_match, instance_ = self._match(group, step, state)
+            if instance_ == instance:
+                return False
+        else:
+            raw_match = None
 
         tape = group.setdefault(instance, [])
 
@@ -183,7 +198,8 @@ class Collector:
             if raw_match:
                 tape.append(ChunkRef(step, raw_match, 1))
             else:
-                tape.append(ChunkRaw(step, [state]))
+                tape.append(ChunkRaw(step, array('i', (state, ))))
+                self._extend_raw_end(backend, tape[-1])
             return True
 
         last = tape[-1]
@@ -194,12 +210,47 @@ class Collector:
             case [ChunkType.RAW, True]:
                 tape.append(ChunkRef(step, raw_match, 1))
             case [ChunkType.REF, False]:
-                tape.append(ChunkRaw(step, [state]))
+                tape.append(ChunkRaw(step, array('i', (state, ))))
+                self._extend_raw_end(backend, tape[-1])
             case [ChunkType.RAW, False]:
                 last.data.append(state)
+                self._extend_raw_end(backend, last)
             
         return True
 
+    def put_batch(self, instance: Hashable, start: int, states: list[int], backend: Hashable = None) -> None:
+        """make entries for consecutive steps, same as put for every state
+
+        if no raw chunk of the group reaches start, whole states are stored as one raw chunk,
+        otherwise falls back to put
+        
+        Parameters:
+        instance: Hashable
+            see valid instances in Collector.__doc__
+        start: int
+            step of the first state
+        states: list[int]
+        backend: Hashable = None
+            tag representing specific process
+        """
+        if not self._is_open or not states:
+            return
+
+        if backend is None:
+            backend = '__EMPTY__'
+        group = self._entries.setdefault(backend, dict())
+        if self._raw_end.get(backend, 0) > start:
+            for step, state in enumerate(states, start):
+                self.put(instance, step, state, backend)
+            return
+
+        tape = group.setdefault(instance, [])
+        if tape and tape[-1].type_ == ChunkType.RAW:
+            tape[-1].data.extend(states)
+        else:
+            tape.append(ChunkRaw(start, array('i', states)))
+        self._extend_raw_end(backend, tape[-1])
+
     def redirect(self, src: Hashable, dst: Hashable) -> bool:
         """copy entries of src as emitted by dst
 
@@ -349,14 +400,24 @@ class Collector:
 
         if step_range:
             history = islice(history, step_range[0], step_range[1])
-        history = list(history)
+        history = fromiter(history, dtype = int64)
         if len(history) == 0:
             return None
         
+        # windows are encoded as numbers in base of the largest state + 1 and counted at once,
+        # patterns are added in order of the first occurence like a scan would add them
+        base = int(history.max()) + 1
         result: dict[tuple, int] = dict()
         for width in windows:
-            for i in range(len(history) - width + 1):
-                pattern = tuple(history[i : i + width])
-                c = result.setdefault(pattern, 0)
-                result[pattern] = c + 1
+            if width > len(history):
+                continue
+            view = sliding_window_view(history, width)
+            if base ** width < 2 ** 63:
+                codes = view @ (base ** arange(width - 1, -1, -1, dtype = int64))
+                _, first, counts = unique(codes, return_index = True, return_counts = True)
+            else:
+                _, first, counts = unique(view, axis = 0, return_index = True, return_counts = True)
+            for i in argsort(first, kind = 'stable'):
+                pattern = tuple(view[first[i]].tolist())
+                result[pattern] = result.get(pattern, 0) + int(counts[i])
         return result
\ No newline at end of file
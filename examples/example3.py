@@ -14,6 +14,6 @@ print('The process branched at 5th step with forced state=3:')
 print(first_5_steps, f.branch(state = 3).take(10))
 
 print('The process branched at 5th step with no possible transitions to state 1:')
-new_matrix = p1.matrix
+new_matrix = p1.matrix_copy()
 new_matrix[:, 1] = 0.0
 print(first_5_steps, f.branch(matrix = new_matrix).take(10))
\ No newline at end of file
@@ -0,0 +1,91 @@
+import json
+import subprocess
+import sys
+from importlib.util import find_spec
+from itertools import pairwise
+
+import pytest
+from numpy import array, ones, float32, ndarray
+from numpy.random import default_rng
+
+from MarkovTool import Markov, Stochastic, Endless
+
+
+def test_fit_rejects_transitions_out_of_the_state_space():
+    for pairs in ([(0, 3)], [(3, 0)], [(-1, 0)], [(0, 1), (1, 4)]):
+        description = Markov(3, initial_state = 0)
+        with pytest.raises(ValueError):
+            description.fit(pairs)
+        with pytest.raises(ValueError):
+            description.fit(array(pairs))
+
+
+def test_fit_updates_rows_searched_by_transition():
+    description = Markov(5, my_seed = 1).fill_random(seed_ = 1)
+    description.initial_state = 0
+    Endless(description).take(10)
+    variant = description.variant(my_seed = 2)
+    description.fit(pairwise(default_rng(0).integers(0, 2, 50).tolist()))
+    for source in (description, variant):
+        fresh = Markov(5, matrix = source.matrix)
+        for state in range(5):
+            for pick in default_rng(state).random(20):
+                assert source._transition(state, pick) == fresh._transition(state, pick)
+
+
+class Subclass(ndarray):
+    pass
+
+
+def test_initial_state_is_never_modified():
+    for value in ([1, 3], array([1, 3], dtype = float32), array([1, 3], dtype = float32).view(Subclass)):
+        description = Markov(2, initial_state = value)
+        assert list(value) == [1, 3]
+        assert description.initial_state.tolist() == [0.25, 0.75]
+
+
+def test_simulate_matches_endless():
+    description = Markov(30, my_seed = 5).fill_random(seed_ = 1)
+    description.initial_state = 0
+    assert description.simulate(2000).tolist() == Endless(description).take(2000)
+
+
+def test_simulate_rejects_non_square_shapes():
+    description = Stochastic((3, 40), my_seed = 0, matrix = ones((3, 40)), initial_state = 0)
+    with pytest.raises(ValueError):
+        description.simulate(5)
+
+
+# printed as json, run with and without numba
+KERNEL_OUTPUTS = """
+import json
+from MarkovTool import Markov, Endless, EndlessBatch, simulate_many
+
+result = {}
+for dimension in (4, 40, 300):
+    description = Markov(dimension, my_seed = dimension).fill_random(seed_ = dimension)
+    description.initial_state = 0
+    instance = Endless(description)
+    instance.skip(1000)
+    result[dimension] = {
+        'matrix': description.matrix.tolist(),
+        'cumulative': description._matrix_cumsum.tolist(),
+        'simulate': description.simulate(1000).tolist(),
+        'take': instance.take(1000),
+        'batch': EndlessBatch(description, 5).take(200).tolist(),
+        'many': simulate_many([Endless(description) for _ in range(3)], 200).tolist(),
+    }
+print(json.dumps(result))
+"""
+
+
+@pytest.mark.skipif(find_spec('numba') is None, reason = 'numba is not installed')
+def test_numba_matches_numpy_fallback():
+    def outputs(prefix: str) -> dict:
+        result = subprocess.run([sys.executable, '-c', prefix + KERNEL_OUTPUTS],
+                                capture_output = True, text = True, check = True, timeout = 300)
+        return json.loads(result.stdout)
+
+    compiled = outputs('')
+    fallback = outputs("import sys; sys.modules['numba'] = None\n")
+    assert compiled == fallback
@@ -0,0 +1,136 @@
+import multiprocessing
+import subprocess
+import sys
+from itertools import islice
+
+import pytest
+from numpy import ones
+
+from MarkovTool import Markov, Stochastic, Endless, Finite, Dependent, EndlessBatch, simulate_many
+
+
+def seeded(dimension: int = 16, my_seed: int = 0) -> Markov:
+    """random description with a fixed initial state, initial picks aren't seeded"""
+    description = Markov(dimension, my_seed = my_seed).fill_random(seed_ = my_seed)
+    description.initial_state = 0
+    return description
+
+
+def test_take_matches_next():
+    for dimension in (4, 300):
+        description = seeded(dimension)
+        stepped = Endless(description)
+        assert Endless(description).take(1000) == [next(stepped) for _ in range(1000)]
+
+
+def test_skip_matches_next():
+    description = seeded()
+    skipped, stepped = Endless(description), Endless(description)
+    skipped.skip(500)
+    for _ in range(500):
+        next(stepped)
+    assert skipped.take(10) == stepped.take(10)
+
+
+def test_branch_continues_stream():
+    instance = Endless(seeded())
+    instance.take(37)
+    branch = instance.branch()
+    assert branch.take(100) == instance.take(100)
+
+
+def instances() -> list:
+    description = seeded()
+    parent = Endless(description)
+    parent.skip(10)
+    branches = [parent.branch() for _ in range(3)]
+    branches.append(parent.branch(state = 5))
+    follower = Dependent(description, parent)
+    return [parent, *branches, follower, Endless(description)]
+
+
+@pytest.mark.parametrize('n', [1, 2, 10, 1000])
+def test_simulate_many_matches_serial_take(n):
+    serial = [instance.take(n) for instance in instances()]
+    assert simulate_many(instances(), n).tolist() == serial
+
+
+def test_simulate_many_stops_in_order():
+    description = seeded()
+    first, finite, last = Endless(description), Finite(description, max_step = 3), Endless(description)
+    with pytest.raises(ValueError):
+        simulate_many([first, finite, last], 5)
+    assert first._step == 5
+    assert last._step == 0
+
+
+def test_endless_batch_take_matches_next():
+    description = seeded()
+    taken = EndlessBatch(description, 7).take(200)
+    stepped = EndlessBatch(description, 7)
+    assert taken.shape == (200, 7)
+    assert taken.tolist() == [next(stepped).tolist() for _ in range(200)]
+
+
+@pytest.mark.parametrize('n', [10, 50, 80, None])
+def test_finite_max_step_block_matches_step(n):
+    description = seeded()
+    blocked, stepped = Finite(description, max_step = 50), Finite(description, max_step = 50)
+    assert blocked.take(n) == list(islice(stepped, n))
+    assert blocked.has_stopped == stepped.has_stopped
+
+
+def test_finite_max_step_skip_matches_step():
+    blocked, stepped = Finite(seeded(), max_step = 50), Finite(seeded(), max_step = 50)
+    blocked.skip(30)
+    for _ in range(30):
+        next(stepped)
+    assert blocked.take() == stepped.take()
+    assert blocked.has_stopped and stepped.has_stopped
+
+
+def test_finite_stop_states():
+    description = seeded(8)
+    stop_states = {6, 7}
+    states = Finite(description, max_step = 200, stop_states = stop_states).take()
+    predicate = Finite(description, lambda self: self._step >= 200 or self.state in stop_states)
+    assert states == predicate.take()
+    assert len(states) == 200 or states[-1] in stop_states
+    assert not stop_states.intersection(states[:-1])
+
+
+def test_non_square_description_falls_back():
+    description = Stochastic((3, 40), my_seed = 0, matrix = ones((3, 40)), initial_state = 0)
+    with pytest.raises(IndexError):
+        Endless(description).take(50)
+    with pytest.raises(IndexError):
+        Endless(description).skip(50)
+    with pytest.raises(ValueError):
+        EndlessBatch(description, 4).take(50)
+
+
+# fresh interpreter, forking after numba has started its threads may hang
+FORKED_INITIAL_STATES = """
+import multiprocessing
+import subprocess
+import sys
+from numpy import ones
+from MarkovTool import Markov, Endless
+
+def first_states(_):
+    description = Markov(4, matrix = ones((4, 4)), initial_state = [1, 1, 1, 1])
+    return [next(Endless(description)) for _ in range(16)]
+
+if __name__ == '__main__':
+    first_states(None)
+    with multiprocessing.get_context('fork').Pool(4) as pool:
+        results = pool.map(first_states, range(4), chunksize = 1)
+    print(len(set(map(tuple, results))))
+"""
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason = 'fork is not available')
+def test_forked_initial_states_differ():
+    result = subprocess.run([sys.executable, '-c', FORKED_INITIAL_STATES],
+                            capture_output = True, text = True, check = True, timeout = 120)
+    assert int(result.stdout) > 1
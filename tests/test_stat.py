@@ -0,0 +1,71 @@
+from random import Random
+
+import pytest
+
+from MarkovTool import Markov, Endless, Collector
+
+
+def tapes(collector: Collector) -> dict:
+    """entries of a collector as plain values, chunks are compared by content"""
+    result = {}
+    for backend, group in collector._entries.items():
+        for instance, tape in group.items():
+            result[backend, instance] = [
+                (chunk.type_, chunk.start, list(chunk.data)) if hasattr(chunk, 'data')
+                else (chunk.type_, chunk.start, chunk.length, chunk.point_to.start)
+                for chunk in tape]
+    return result
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_put_batch_matches_put(seed):
+    random = Random(seed)
+    batched, stepped = Collector(), Collector()
+    steps = {instance: random.randrange(5) for instance in range(4)}
+    for _ in range(100):
+        instance = random.randrange(4)
+        backend = random.choice([None, 'other'])
+        states = [random.randrange(3) for _ in range(random.randrange(1, 6))]
+        batched.put_batch(instance, steps[instance], states, backend)
+        for step, state in enumerate(states, steps[instance]):
+            stepped.put(instance, step, state, backend)
+        steps[instance] += len(states)
+    assert tapes(batched) == tapes(stepped)
+
+
+def test_block_generation_emits_like_next():
+    description = Markov(6, my_seed = 2).fill_random(seed_ = 2)
+    description.initial_state = 0
+    blocked, stepped = Endless(description), Endless(description)
+    blocked_collector, stepped_collector = Collector(blocked), Collector(stepped)
+    blocked.take(300)
+    blocked.skip(300)
+    for _ in range(600):
+        next(stepped)
+    assert list(blocked_collector.playback(blocked)) == list(stepped_collector.playback(stepped))
+
+
+def counted_by_scan(history: list[int], windows: tuple[int]) -> dict[tuple, int]:
+    result = {}
+    for width in windows:
+        for i in range(len(history) - width + 1):
+            pattern = tuple(history[i : i + width])
+            result[pattern] = result.get(pattern, 0) + 1
+    return result
+
+
+@pytest.mark.parametrize('windows, step_range', [
+    ((1, ), None), ((1, 2, 3), None), ((2, 2), (10, 200)), ((9, ), (0, 50)), ((5000, ), None)])
+def test_count_matches_scan(windows, step_range):
+    description = Markov(300, my_seed = 1).fill_random(seed_ = 1)
+    description.initial_state = 0
+    instance = Endless(description)
+    collector = Collector(instance)
+    instance.take(3000)
+    history = list(collector.playback(instance))
+    if step_range:
+        history = history[step_range[0] : step_range[1]]
+    result = collector.count(instance, windows, step_range)
+    expected = counted_by_scan(history, windows)
+    assert result == expected
+    assert list(result) == list(expected)